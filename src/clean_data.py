@@ -2,11 +2,18 @@ from __future__ import annotations
 
 from pathlib import Path
 import re
+from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 
-from utils.io_helpers import project_path, read_json, write_json
+from utils.io_helpers import project_path, read_json, write_csv, write_records_json
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; snapshots are then loaded whole
+    ijson = None
 
 """
 Data Cleaning Script
@@ -30,6 +37,32 @@ all content is already in English, so translation is not applied.
 PROCESSED_DIR = project_path("data", "processed")
 OUT_JSON = PROCESSED_DIR / "books_clean.json"
 OUT_CSV = PROCESSED_DIR / "prices.csv"
+OUT_PARQUET = PROCESSED_DIR / "prices.parquet"
+
+# Column order of the cleaned table
+COLUMNS = [
+    "snapshot_time",
+    "site",
+    "product_id",
+    "name",
+    "category",
+    "price",
+    "orig_price",
+    "currency",
+    "availability",
+    "url",
+    "source_url",
+]
+
+# Shared HTML parser and compiled patterns used while cleaning
+_PARSER = lxml_html.HTMLParser()
+# Example URL:
+# http://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html
+_URL_RE = re.compile(r"/catalogue/([^/]+)/index\.html")
+_NON_PRICE_RE = re.compile(r"[^\d.]")
+
+# Columns whose values repeat across rows and snapshots, stored as category
+CATEGORY_COLUMNS = ["site", "product_id", "currency", "availability"]
 
 
 def strip_html(text: str | None) -> str | None:
@@ -41,8 +74,13 @@ def strip_html(text: str | None) -> str | None:
     """
     if text is None or pd.isna(text):
         return None
-    # Use BeautifulSoup to robustly remove HTML tags
-    return BeautifulSoup(str(text), "lxml").get_text(strip=True)
+    s = str(text)
+    # Only pay for an HTML parser when the text can contain a tag
+    if "<" not in s:
+        return s.strip()
+    # Parse as a fragment under a wrapper element, so input without any
+    # element content (e.g. only a comment) yields "" instead of raising
+    return lxml_html.fragment_fromstring(s, create_parent="div", parser=_PARSER).text_content().strip()
 
 
 def maybe_translate_to_english(text: str | None) -> str | None:
@@ -57,40 +95,57 @@ def maybe_translate_to_english(text: str | None) -> str | None:
     return text
 
 
-def normalize_record(raw: dict, snapshot_time: str) -> dict:
+# Columns filled per record by normalize_record; product_id and the
+# numeric price are derived later, column-wise, once all records are in
+# a DataFrame (see main)
+RECORD_COLUMNS = [c for c in COLUMNS if c != "product_id"]
+
+
+def normalize_record(raw: dict, snapshot_time: str, columns: dict[str, list]) -> None:
     """
     Normalize a single raw product record into a flat schema.
 
-    We also derive a simple product_id from the URL (slug before '/index.html'),
-    which allows us to track the same product across multiple snapshots.
+    Values are appended to `columns` (one list per entry of RECORD_COLUMNS)
+    so the DataFrame can be built column-wise instead of from a list of dicts.
     """
-    url = raw.get("url") or ""
-    # Example URL:
-    # http://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html
-    m = re.search(r"/catalogue/([^/]+)/index\.html", url)
-    product_id = m.group(1) if m else None
-
-    name = raw.get("name")
-    availability = raw.get("availability")
-    currency = raw.get("currency") or "GBP"
+    get = raw.get
 
     # Strip HTML and (if needed) translate to English
-    name = maybe_translate_to_english(strip_html(name))
-    availability = maybe_translate_to_english(strip_html(availability))
-
-    return {
-        "snapshot_time": snapshot_time,
-        "site": raw.get("site") or "books",
-        "product_id": product_id,
-        "name": name,
-        "category": raw.get("category"),        # remains None for this dataset
-        "price": raw.get("price"),
-        "orig_price": raw.get("orig_price"),
-        "currency": currency,
-        "availability": availability,
-        "url": url,
-        "source_url": raw.get("source_url"),
-    }
+    name = maybe_translate_to_english(strip_html(get("name")))
+    availability = maybe_translate_to_english(strip_html(get("availability")))
+
+    columns["snapshot_time"].append(snapshot_time)
+    columns["site"].append(get("site") or "books")
+    columns["name"].append(name)
+    columns["category"].append(get("category"))  # remains None for this dataset
+    columns["price"].append(get("price"))
+    columns["orig_price"].append(get("orig_price"))
+    columns["currency"].append(get("currency") or "GBP")
+    columns["availability"].append(availability)
+    columns["url"].append(get("url") or "")
+    columns["source_url"].append(get("source_url"))
+
+
+def _stream_items(path: Path) -> Iterator[dict]:
+    with path.open("rb") as f:
+        yield from ijson.items(f, "items.item", use_float=True)
+
+
+def load_snapshot(path: Path) -> tuple[str | None, Iterable[dict]]:
+    """
+    Return the snapshot_time and the raw items of a snapshot file.
+
+    With ijson installed the items are streamed one record at a time, so
+    only the current record is held in memory; snapshot_time is read in a
+    short first pass (get_data writes it before the items).
+    """
+    if ijson is None:
+        data = read_json(path)
+        return data.get("snapshot_time"), data.get("items", [])
+
+    with path.open("rb") as f:
+        snapshot_time = next(ijson.items(f, "snapshot_time"), None)
+    return snapshot_time, _stream_items(path)
 
 
 def main() -> None:
@@ -101,22 +156,32 @@ def main() -> None:
         print("[WARN] No snapshot_books_*.json found in data/raw. Run get_data.py first.")
         return
 
-    rows: list[dict] = []
+    columns: dict[str, list] = {c: [] for c in RECORD_COLUMNS}
 
     # ------------------------------------------------------------
     # 1. Load all raw snapshots and normalize records
     # ------------------------------------------------------------
     for path in snapshots:
-        data = read_json(path)
-        snapshot_time = data.get("snapshot_time")
-        for item in data.get("items", []):
-            rows.append(normalize_record(item, snapshot_time))
+        snapshot_time, items = load_snapshot(path)
+        for item in items:
+            normalize_record(item, snapshot_time, columns)
 
-    if not rows:
+    if not columns["url"]:
         print("[WARN] No items found in raw snapshots. Nothing to clean.")
         return
 
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame(columns, columns=COLUMNS)
+
+    # Derive a simple product_id from the URL (slug before '/index.html'),
+    # which allows us to track the same product across multiple snapshots.
+    df["product_id"] = df["url"].str.extract(_URL_RE, expand=False)
+
+    # Raw prices may be text such as "£51.77" (older snapshots store floats);
+    # keep only digits and the decimal point before converting.
+    df["price"] = pd.to_numeric(
+        df["price"].astype(str).str.replace(_NON_PRICE_RE, "", regex=True),
+        errors="coerce",
+    )
 
     # ------------------------------------------------------------
     # 2. Handle missing values
@@ -125,7 +190,7 @@ def main() -> None:
     #    - Fill missing availability with a label
     # ------------------------------------------------------------
     before_rows = len(df)
-    df = df.dropna(subset=["name", "price"]).copy()
+    df = df.dropna(subset=["name", "price"])
     after_rows = len(df)
     print(f"[INFO] Dropped {before_rows - after_rows} rows with missing name or price.")
 
@@ -135,9 +200,12 @@ def main() -> None:
     # ------------------------------------------------------------
     # 3. Remove duplicate records
     #    We treat (site, url) as a unique product snapshot.
+    #    The key columns are hashed into a single uint64 per row so
+    #    duplicates are found on one column instead of three.
     # ------------------------------------------------------------
     before_dups = len(df)
-    df = df.drop_duplicates(subset=["site", "url", "snapshot_time"]).reset_index(drop=True)
+    key = pd.util.hash_pandas_object(df[["site", "url", "snapshot_time"]], index=False)
+    df = df.loc[~key.duplicated()]
     after_dups = len(df)
     print(f"[INFO] Removed {before_dups - after_dups} duplicate rows.")
 
@@ -148,25 +216,38 @@ def main() -> None:
     df["price"] = pd.to_numeric(df["price"], errors="coerce")
     df["orig_price"] = pd.to_numeric(df["orig_price"], errors="coerce")
 
-    # Sort for reproducibility
+    # Repeated string values are stored as category codes; the Parquet
+    # output keeps these dtypes for the analysis scripts
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+
+    # Sort for reproducibility; category keys compare by integer code
     df = df.sort_values(["site", "product_id", "snapshot_time"]).reset_index(drop=True)
 
     # ------------------------------------------------------------
-    # 5. Save cleaned, structured data as JSON and CSV
+    # 5. Save cleaned, structured data as Parquet, JSON and CSV
     # ------------------------------------------------------------
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Convert Timestamp to ISO string so that json can serialize it
-    if pd.api.types.is_datetime64_any_dtype(df["snapshot_time"]):
-        df["snapshot_time"] = df["snapshot_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    # Parquet: typed columnar copy that the analysis scripts load first
+    df.to_parquet(OUT_PARQUET, compression="zstd", index=False)
+    print(f"[OK] Wrote cleaned Parquet -> {OUT_PARQUET} with {len(df)} rows.")
+
+    # Convert Timestamp to ISO string ("%Y-%m-%dT%H:%M:%SZ") so that json can
+    # serialize it. Formatting via NumPy avoids the dtype-inference
+    # FutureWarning that .dt.strftime emits with pandas 2.x string inference.
+    ts = df["snapshot_time"]
+    if pd.api.types.is_datetime64_any_dtype(ts):
+        utc = ts.dt.tz_convert(None) if ts.dt.tz is not None else ts
+        text = np.datetime_as_string(utc.to_numpy(dtype="datetime64[s]"), unit="s")
+        df["snapshot_time"] = pd.Series(np.char.add(text, "Z"), index=df.index).where(ts.notna())
 
-    # JSON: list of plain Python dicts (structured format)
-    records = df.to_dict(orient="records")
-    write_json(OUT_JSON, records)
-    print(f"[OK] Wrote structured JSON -> {OUT_JSON} with {len(records)} records.")
+    # JSON: list of records (structured format)
+    write_records_json(OUT_JSON, df)
+    print(f"[OK] Wrote structured JSON -> {OUT_JSON} with {len(df)} records.")
 
     # CSV: convenient for later analysis in pandas
-    df.to_csv(OUT_CSV, index=False)
+    write_csv(OUT_CSV, df)
     print(f"[OK] Wrote cleaned CSV -> {OUT_CSV} with {len(df)} rows.")
 
 
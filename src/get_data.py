@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import json
-import random
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from lxml import etree, html as lxml_html
 
 from utils.io_helpers import project_path, write_json
 
@@ -18,10 +19,21 @@ Data Source:
 Books to Scrape (http://books.toscrape.com/) is a purposely designed
 static e-commerce website for practicing web scraping.
 
-Because it serves static HTML (no JavaScript rendering), it is ideal
-for DSCI 510 course projects that require using requests + BeautifulSoup.
+Because it serves static HTML (no JavaScript rendering), it can be
+scraped with a plain HTTP client and HTML parser; this script uses
+httpx + lxml.
 """
 
+# Shared HTML parser and compiled XPath queries for the listing page
+# (see parse_book_list); pages are parsed on the main thread only
+_PARSER = lxml_html.HTMLParser()
+_PRODUCTS = etree.XPath("//article[@class='product_pod']")
+_A = etree.XPath(".//h3/a")
+_PRICE = etree.XPath(".//p[@class='price_color']/text()")
+_AVAIL = etree.XPath(".//p[contains(concat(' ', @class, ' '), ' instock ')]//text()")
+_CURRENT_PAGE = etree.XPath("//li[@class='current']/text()")
+_PAGE_COUNT_RE = re.compile(r"Page\s+\d+\s+of\s+(\d+)")
+
 BASE_URL = "http://books.toscrape.com/catalogue/"
 START_PAGE = 1
 MAX_PAGES = 50  # maximum number of pages to attempt
@@ -36,11 +48,43 @@ HEADERS: Dict[str, str] = {
     ),
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
 }
 
 
-# Random delay to avoid sending requests too quickly
-REQUEST_DELAY_SEC = (1.0, 2.0)
+# Listing pages are fetched concurrently by a small thread pool, but request
+# start times are still spaced out to avoid hitting the server too quickly
+MAX_WORKERS = 8
+REQUEST_INTERVAL_SEC = 0.1
+
+
+class _Throttle:
+    """Space out request start times across worker threads."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+# One keep-alive connection pool shared by all worker threads. HTTP/2 is
+# negotiated over TLS, so it is used when the site is reached via https.
+CLIENT = httpx.Client(
+    http2=True,
+    headers=HEADERS,
+    timeout=15,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=MAX_WORKERS, max_keepalive_connections=MAX_WORKERS),
+)
+
+_THROTTLE = _Throttle(REQUEST_INTERVAL_SEC)
 
 
 def fetch(url: str) -> Optional[str]:
@@ -48,13 +92,14 @@ def fetch(url: str) -> Optional[str]:
     Send an HTTP GET request and return HTML text if successful.
     Returns None if the request fails or server responds with an error code.
     """
+    _THROTTLE.wait()
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = CLIENT.get(url)
         if resp.status_code == 200:
             return resp.text
         print(f"[WARN] {url} -> HTTP {resp.status_code}")
         return None
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"[ERROR] {url} -> {e}")
         return None
 
@@ -75,18 +120,18 @@ def parse_book_list(html: str, page_url: str) -> List[Dict[str, Any]]:
 
     Returns a list of dictionaries containing book metadata.
     """
-    soup = BeautifulSoup(html, "lxml")
+    tree = lxml_html.fromstring(html, parser=_PARSER)
     items: List[Dict[str, Any]] = []
 
-    products = soup.select("article.product_pod")
+    products = _PRODUCTS(tree)
     if not products:
         print(f"[INFO] No product pods found on {page_url}")
         return items
 
     for art in products:
         # Extract name and product page URL
-        a_tag = art.find("h3").find("a")
-        name = a_tag.get("title") or a_tag.get_text(strip=True)
+        a_tag = _A(art)[0]
+        name = a_tag.get("title") or a_tag.text_content().strip()
         href = a_tag.get("href")
 
         # Convert relative URL to absolute
@@ -95,23 +140,11 @@ def parse_book_list(html: str, page_url: str) -> List[Dict[str, Any]]:
         else:
             url = BASE_URL + href.lstrip("./")
 
-        # Extract price text “£51.77”
-        price_text = ""
-        price_tag = art.find("p", class_="price_color")
-        if price_tag:
-            price_text = price_tag.get_text(strip=True)
-
-        price = None
-        if price_text:
-            m = re.search(r"(\d+[\.,]?\d*)", price_text)
-            if m:
-                price = float(m.group(1).replace(",", ""))
+        # Extract price text “£51.77”; numeric parsing happens in clean_data
+        price = "".join(_PRICE(art)).strip() or None
 
         # Extract availability information
-        availability = ""
-        avail_tag = art.find("p", class_="instock")
-        if avail_tag:
-            availability = avail_tag.get_text(strip=True)
+        availability = "".join(t.strip() for t in _AVAIL(art))
 
         items.append(
             {
@@ -131,9 +164,25 @@ def parse_book_list(html: str, page_url: str) -> List[Dict[str, Any]]:
     return items
 
 
+def parse_page_count(html: str) -> Optional[int]:
+    """
+    Read the total number of listing pages from the pager text
+    ("Page 1 of 50"). Returns None if the pager is missing.
+    """
+    tree = lxml_html.fromstring(html, parser=_PARSER)
+    m = _PAGE_COUNT_RE.search(" ".join(_CURRENT_PAGE(tree)))
+    return int(m.group(1)) if m else None
+
+
+def page_url(page: int) -> str:
+    """Return the URL of a listing page."""
+    return BASE_URL + f"page-{page}.html"
+
+
 def scrape() -> Dict[str, Any]:
     """
-    Loop through listing pages until:
+    Fetch the first listing page to discover the page count, then fetch
+    the remaining pages concurrently. Pages are processed in order until:
     - no HTML is returned, or
     - no products are found on the page.
 
@@ -144,18 +193,23 @@ def scrape() -> Dict[str, Any]:
     snapshot_time = datetime.now(timezone.utc).isoformat()
     out: Dict[str, Any] = {"snapshot_time": snapshot_time, "items": []}
 
-    for page in range(START_PAGE, MAX_PAGES + 1):
+    first_url = page_url(START_PAGE)
+    print(f"[INFO] Fetching page {START_PAGE}: {first_url}")
+    first_html = fetch(first_url)
+    if not first_html:
+        print(f"[INFO] Stopping at page {START_PAGE}: no HTML content.")
+        return out
 
-        # Construct the URL for each page
-        if page == 1:
-            url = BASE_URL + "page-1.html"
-        else:
-            url = BASE_URL + f"page-{page}.html"
+    # Fall back to MAX_PAGES if the pager cannot be read
+    last_page = min(parse_page_count(first_html) or MAX_PAGES, MAX_PAGES)
+    pages = list(range(START_PAGE + 1, last_page + 1))
+    urls = [page_url(page) for page in pages]
 
-        print(f"[INFO] Fetching page {page}: {url}")
-        html = fetch(url)
-        time.sleep(random.uniform(*REQUEST_DELAY_SEC))
+    print(f"[INFO] Fetching pages {START_PAGE + 1}-{last_page} with {MAX_WORKERS} workers")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        htmls = [first_html] + list(ex.map(fetch, urls))
 
+    for page, url, html in zip([START_PAGE] + pages, [first_url] + urls, htmls):
         if not html:
             print(f"[INFO] Stopping at page {page}: no HTML content.")
             break
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-import json
 from typing import Dict, Any
 
 import numpy as np
 import pandas as pd
 
-from utils.io_helpers import project_path
+from utils.io_helpers import project_path, write_csv, write_json
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; Pandas groupby is used as a fallback
+    njit = None
 
 """
 Data Analysis Script
@@ -21,41 +25,144 @@ Tasks:
 """
 
 IN_CSV = project_path("data", "processed", "prices.csv")
+IN_PARQUET = IN_CSV.with_suffix(".parquet")
 RESULTS_DIR = project_path("results")
 SUMMARY_JSON = RESULTS_DIR / "summary_stats.json"
 METRICS_CSV = RESULTS_DIR / "metrics_by_product.csv"
 
+# Loading the cached compiled kernel costs ~150 ms on its first call in a
+# process; the compiled reduction only pays that back from about this many
+# rows on (measured against the groupby path in a fresh process)
+NUMBA_MIN_ROWS = 700_000
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _reduce_by_code(codes, prices, k):
+        """Count, min, max, sum and first row of prices per integer group code."""
+        n = np.zeros(k, np.int64)
+        mn = np.full(k, np.inf)
+        mx = np.full(k, -np.inf)
+        sm = np.zeros(k, np.float64)
+        first = np.full(k, -1, np.int64)
+        for i in range(codes.size):
+            c = codes[i]
+            p = prices[i]
+            if n[c] == 0:
+                first[c] = i
+            n[c] += 1
+            sm[c] += p
+            if p < mn[c]:
+                mn[c] = p
+            if p > mx[c]:
+                mx[c] = p
+        return n, mn, mx, sm, first
+
 
 def compute_global_stats(df: pd.DataFrame) -> Dict[str, Any]:
     """Compute descriptive statistics for book prices using NumPy."""
-    prices = df["price"].dropna().values.astype(float)
+    prices = df["price"].to_numpy(dtype=np.float64, na_value=np.nan)
+    prices = prices[~np.isnan(prices)]
+
+    # One sort-based pass for all order statistics
+    q_min, p25, median, p75, q_max = np.quantile(prices, [0.0, 0.25, 0.5, 0.75, 1.0])
 
     stats: Dict[str, Any] = {
         "count": int(prices.size),
-        "mean": float(np.mean(prices)),
-        "median": float(np.median(prices)),
-        "std": float(np.std(prices, ddof=1)),
-        "min": float(np.min(prices)),
-        "max": float(np.max(prices)),
-        "p25": float(np.percentile(prices, 25)),
-        "p75": float(np.percentile(prices, 75)),
+        "mean": float(prices.mean()),
+        "median": float(median),
+        "std": float(prices.std(ddof=1)),
+        "min": float(q_min),
+        "max": float(q_max),
+        "p25": float(p25),
+        "p75": float(p75),
     }
     return stats
 
 
+def compute_product_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute per-product price statistics using Pandas groupby, or a
+    compiled Numba reduction on the product_id codes for large inputs.
+    """
+    # Rows without a product key are not part of any group
+    df = df.dropna(subset=["product_id", "name"])
+
+    # Single snapshot: every product appears once, so no aggregation is needed
+    if not df["product_id"].duplicated().any():
+        price = df["price"]
+        return pd.DataFrame(
+            {
+                "product_id": df["product_id"],
+                "name": df["name"],
+                "n_obs": 1,
+                "price_min": price,
+                "price_max": price,
+                "price_mean": price,
+            }
+        ).reset_index(drop=True)
+
+    # product_id is already categorical when loaded from Parquet
+    product_id = df["product_id"].astype("category")
+
+    if njit is not None and len(df) >= NUMBA_MIN_ROWS:
+        # Reduce on the category codes in one compiled pass
+        codes = product_id.cat.codes.to_numpy()
+        prices = df["price"].to_numpy(dtype=np.float64)
+        k = len(product_id.cat.categories)
+        n, mn, mx, sm, first = _reduce_by_code(codes, prices, k)
+
+        # Groups are (product_id, name) pairs, so the per-product result is
+        # only valid if every row carries its product's first name; titles
+        # that change across snapshots go through the groupby below
+        name_codes, _ = pd.factorize(df["name"])
+        if (name_codes == name_codes[first[codes]]).all():
+            # Keep observed products in order of first appearance, like groupby
+            observed = np.flatnonzero(n)
+            observed = observed[np.argsort(first[observed], kind="stable")]
+            rows = first[observed]
+            return pd.DataFrame(
+                {
+                    "product_id": product_id.cat.categories[observed],
+                    "name": df["name"].take(rows).to_numpy(),
+                    "n_obs": n[observed],
+                    "price_min": mn[observed],
+                    "price_max": mx[observed],
+                    "price_mean": sm[observed] / n[observed],
+                }
+            )
+
+    grouped = df["price"].groupby(
+        [product_id, df["name"].astype("category")], sort=False, observed=True
+    )
+    metrics = pd.DataFrame(
+        {
+            "n_obs": grouped.size(),
+            "price_min": grouped.min(),
+            "price_max": grouped.max(),
+            "price_mean": grouped.mean(),
+        }
+    )
+    return metrics.reset_index()
+
+
 def main() -> None:
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
     # ---------------------------
-    # 1. Load cleaned CSV
+    # 1. Load cleaned data
     # ---------------------------
-    df = pd.read_csv(IN_CSV)
+    # Prefer the typed Parquet copy; fall back to the CSV
+    if IN_PARQUET.exists():
+        df = pd.read_parquet(IN_PARQUET)
+    else:
+        df = pd.read_csv(IN_CSV, engine="pyarrow")
 
     if df.empty:
         print("[WARN] prices.csv is empty. Run clean_data.py first.")
         return
 
-    df["price"] = pd.to_numeric(df["price"], errors="coerce")
     df = df.dropna(subset=["price"])
 
     # ---------------------------
@@ -69,25 +176,15 @@ def main() -> None:
     # ---------------------------
     # 3. Per-product metrics
     # ---------------------------
-    metrics = (
-        df.groupby(["product_id", "name"])
-        .agg(
-            n_obs=("price", "count"),
-            price_min=("price", "min"),
-            price_max=("price", "max"),
-            price_mean=("price", "mean"),
-        )
-        .reset_index()
-    )
+    metrics = compute_product_metrics(df)
 
     # ---------------------------
     # 4. Save output
     # ---------------------------
-    with SUMMARY_JSON.open("w", encoding="utf-8") as f:
-        json.dump({"global_stats": global_stats}, f, indent=2)
+    write_json(SUMMARY_JSON, {"global_stats": global_stats})
     print(f"[OK] Saved summary -> {SUMMARY_JSON}")
 
-    metrics.to_csv(METRICS_CSV, index=False)
+    write_csv(METRICS_CSV, metrics)
     print(f"[OK] Saved per-product metrics -> {METRICS_CSV}")
 
 
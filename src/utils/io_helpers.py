@@ -4,6 +4,27 @@ import json
 from typing import Any, Iterable, Dict
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used as a fallback
+    orjson = None
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; pandas is used as a fallback
+    pl = None
+
+# Every script imports this module, so these apply to the whole pipeline:
+# Copy-on-Write avoids defensive copies, and string columns use the
+# pyarrow-backed string dtype. Both are the default from pandas 3.0 on,
+# where setting copy_on_write is deprecated; future.infer_string only
+# exists from pandas 2.1 on.
+_PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+if _PANDAS_VERSION < (3, 0):
+    pd.options.mode.copy_on_write = True
+    if _PANDAS_VERSION >= (2, 1):
+        pd.options.future.infer_string = True
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
 def project_path(*parts: str) -> Path:
@@ -11,10 +32,21 @@ def project_path(*parts: str) -> Path:
 
 def write_json(path: Path, data: Any) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        path.write_bytes(orjson.dumps(data, option=option))
+        return
     with path.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 def read_json(path: Path) -> Any:
+    if orjson is not None:
+        raw = path.read_bytes()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Older files may contain NaN, which only the stdlib parser accepts
+            return json.loads(raw)
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -23,3 +55,19 @@ def append_csv(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
     df = pd.DataFrame(list(rows))
     header = not path.exists()
     df.to_csv(path, mode="a", header=header, index=False)
+
+def write_csv(path: Path, df: pd.DataFrame) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if pl is not None:
+        pl.from_pandas(df).write_csv(path)
+    else:
+        df.to_csv(path, index=False)
+
+def write_records_json(path: Path, df: pd.DataFrame) -> None:
+    # Always an indented list of records with missing values as null,
+    # whichever optional packages are installed
+    if pl is not None:
+        records = pl.from_pandas(df).rows(named=True)
+    else:
+        records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    write_json(path, records)
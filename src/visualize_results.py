@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
+import matplotlib
+
+matplotlib.use("Agg")  # plots are only saved to files
+
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 from utils.io_helpers import project_path
@@ -19,79 +24,98 @@ All plots are saved in the results/ folder.
 """
 
 IN_CSV = project_path("data", "processed", "prices.csv")
+IN_PARQUET = IN_CSV.with_suffix(".parquet")
 OUT_DIR = project_path("results")
 
 
-def plot_histogram(df):
-    plt.figure(figsize=(8, 5))
-    plt.hist(df["price"], bins=20)
-    plt.title("Distribution of Book Prices")
-    plt.xlabel("Price (GBP)")
-    plt.ylabel("Frequency")
+def plot_histogram(fig, ax, df):
+    # Bin with NumPy and draw the precomputed counts
+    prices = df["price"].to_numpy(dtype=np.float64, copy=False)
+    counts, edges = np.histogram(prices, bins=20)
+
+    fig.set_size_inches(8, 5)
+    ax.cla()
+    ax.stairs(counts, edges, fill=True)
+    ax.set_title("Distribution of Book Prices")
+    ax.set_xlabel("Price (GBP)")
+    ax.set_ylabel("Frequency")
 
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     out = OUT_DIR / "hist_price.png"
-    plt.tight_layout()
-    plt.savefig(out, dpi=150)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(out, dpi=100)
     return out
 
 
-def plot_boxplot(df):
-    plt.figure(figsize=(6, 5))
-    plt.boxplot(df["price"], vert=True, showmeans=True)
-    plt.title("Boxplot of Book Prices")
-    plt.ylabel("Price (GBP)")
+def plot_boxplot(fig, ax, df):
+    fig.set_size_inches(6, 5)
+    ax.cla()
+    ax.boxplot(df["price"], vert=True, showmeans=True)
+    ax.set_title("Boxplot of Book Prices")
+    ax.set_ylabel("Price (GBP)")
 
     out = OUT_DIR / "boxplot_price.png"
-    plt.tight_layout()
-    plt.savefig(out, dpi=150)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(out, dpi=100)
     return out
 
 
-def plot_top10(df):
-    # Find max price per product
-    top10 = (
-        df.groupby(["product_id", "name"])["price"]
-        .max()
-        .sort_values(ascending=False)
-        .head(10)
-        .reset_index()
-    )
-
-    plt.figure(figsize=(10, 6))
-    plt.barh(top10["name"], top10["price"])
-    plt.title("Top 10 Most Expensive Books")
-    plt.xlabel("Price (GBP)")
-    plt.ylabel("Book Title")
-    plt.tight_layout()
+def plot_top10(fig, ax, df):
+    # Find max price per product; with a single snapshot every row is
+    # already one product, so no groupby is needed
+    if df["product_id"].is_unique:
+        names = df["name"].to_numpy()
+        prices = df["price"].to_numpy(dtype=np.float64, copy=False)
+    else:
+        per_product = df.groupby(["product_id", "name"], observed=True)["price"].max()
+        names = per_product.index.get_level_values("name").to_numpy()
+        prices = per_product.to_numpy(dtype=np.float64)
+
+    # Select the 10 highest prices without sorting the whole array
+    k = min(10, prices.size)
+    idx = np.argpartition(-prices, k - 1)[:k]
+    order = idx[np.argsort(-prices[idx], kind="stable")]
+
+    fig.set_size_inches(10, 6)
+    ax.cla()
+    ax.barh(names[order], prices[order])
+    ax.set_title("Top 10 Most Expensive Books")
+    ax.set_xlabel("Price (GBP)")
+    ax.set_ylabel("Book Title")
+    fig.tight_layout()
 
     out = OUT_DIR / "top10_books.png"
-    plt.savefig(out, dpi=150)
-    plt.close()
+    fig.savefig(out, dpi=100)
     return out
 
 
 def main():
-    df = pd.read_csv(IN_CSV)
+    # Prefer the typed Parquet copy; fall back to the CSV
+    if IN_PARQUET.exists():
+        df = pd.read_parquet(IN_PARQUET)
+    else:
+        df = pd.read_csv(IN_CSV, engine="pyarrow")
 
     if df.empty:
         print("[WARN] prices.csv is empty. Run clean_data.py first.")
         return
 
-    df["price"] = pd.to_numeric(df["price"], errors="coerce")
     df = df.dropna(subset=["price"])
 
-    p1 = plot_histogram(df)
+    # One Figure/Axes pair is reused for all plots
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    p1 = plot_histogram(fig, ax, df)
     print(f"[OK] Saved {p1}")
 
-    p2 = plot_boxplot(df)
+    p2 = plot_boxplot(fig, ax, df)
     print(f"[OK] Saved {p2}")
 
-    p3 = plot_top10(df)
+    p3 = plot_top10(fig, ax, df)
     print(f"[OK] Saved {p3}")
 
+    plt.close(fig)
+
 
 if __name__ == "__main__":
     main()